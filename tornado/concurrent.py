@@ -168,6 +168,10 @@ class Future(object):
         self._log_traceback = False   # Used for Python >= 3.4
         self._tb_logger = None        # Used for Python <= 3.3
 
+        # A plain list is the cheapest storage here even though most
+        # futures get a single callback: a dedicated slot for the first
+        # one costs more in extra attribute accesses than the (freelist)
+        # list allocation it would save.
         self._callbacks = []
 
     # Implement the Python 3.5 Awaitable protocol if possible
@@ -21,6 +21,7 @@
 
 from __future__ import absolute_import, division, print_function, with_statement
 
+import os
 import re
 import sys
 
@@ -48,9 +49,19 @@ try:
 except NameError:
     unichr = chr
 
-_XHTML_ESCAPE_RE = re.compile('[&<>"\']')
 _XHTML_ESCAPE_DICT = {'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;',
                       '\'': '&#39;'}
+# Translation table for unicode strings; str.translate does the substitution
+# in a single C-level pass without calling back into python for each match.
+_XHTML_ESCAPE_TABLE = dict((ord(k), unicode_type(v))
+                           for k, v in _XHTML_ESCAPE_DICT.items())
+
+# Templates escape the same short strings over and over, so remember
+# the results for those.  The cache is simply emptied when it fills up;
+# plain dict operations are atomic so no lock is needed.
+_XHTML_ESCAPE_CACHE = {}
+_XHTML_ESCAPE_CACHE_SIZE = 1024
+_XHTML_ESCAPE_CACHE_MAX_LEN = 256
 
 
 def xhtml_escape(value):
@@ -63,13 +74,93 @@ def xhtml_escape(value):
 
        添加了单引号到转义字符串列表.
     """
-    return _XHTML_ESCAPE_RE.sub(lambda match: _XHTML_ESCAPE_DICT[match.group(0)],
-                                to_basestring(value))
+    value = to_basestring(value)
+    # Only unicode strings are cached: on python 2 an ascii byte string
+    # compares equal to its unicode counterpart but must keep its type.
+    if (type(value) is unicode_type and
+            len(value) <= _XHTML_ESCAPE_CACHE_MAX_LEN):
+        escaped = _XHTML_ESCAPE_CACHE.get(value)
+        if escaped is None:
+            escaped = _xhtml_escape(value)
+            if len(_XHTML_ESCAPE_CACHE) >= _XHTML_ESCAPE_CACHE_SIZE:
+                _XHTML_ESCAPE_CACHE.clear()
+            _XHTML_ESCAPE_CACHE[value] = escaped
+        return escaped
+    return _xhtml_escape(value)
+
+
+def _xhtml_escape_python(value):
+    # Most strings contain nothing that needs escaping, so check for
+    # that first and return the original object unchanged.  Substring
+    # tests for single characters use memchr, which scans much faster
+    # than the regex engine, especially on long strings.
+    if not ('&' in value or '<' in value or '>' in value or
+            '"' in value or "'" in value):
+        return value
+    if isinstance(value, unicode_type):
+        return value.translate(_XHTML_ESCAPE_TABLE)
+    # Byte strings (python 2 only) can't be expanded by translate.
+    # Each replace builds its result in a single allocation in C, which
+    # is much faster than a regex callback per match.  "&" must go first.
+    return (value.replace('&', '&amp;').replace('<', '&lt;')
+            .replace('>', '&gt;').replace('"', '&quot;')
+            .replace("'", '&#39;'))
+
+# The C version only accepts unicode strings, so it is not used on
+# python 2 where xhtml_escape may be given byte strings.
+if (os.environ.get('TORNADO_NO_EXTENSION') or
+        os.environ.get('TORNADO_EXTENSION') == '0' or bytes is str):
+    # These environment variables exist to make it easier to do performance
+    # comparisons; they are not guaranteed to remain supported in the future.
+    _xhtml_escape = _xhtml_escape_python
+else:
+    try:
+        from tornado.speedups import xhtml_escape as _xhtml_escape
+    except ImportError:
+        if os.environ.get('TORNADO_EXTENSION') == '1':
+            raise
+        _xhtml_escape = _xhtml_escape_python
+
+
+_HTML_ENTITY_RE = re.compile(r"&#?\w+;")
 
 
 def xhtml_unescape(value):
     """反转义一个已经XML转义过的字符串."""
-    return re.sub(r"&(#?)(\w+?);", _convert_entity, _unicode(value))
+    global _HTML_ENTITY_MAP
+    value = _unicode(value)
+    if '&' not in value:
+        return value
+    if _HTML_ENTITY_MAP is None:
+        # Built on first use so importing this module stays cheap.
+        # Concurrent callers may each build it; the result is the same.
+        _HTML_ENTITY_MAP = _build_entity_map()
+    entity_map = _HTML_ENTITY_MAP
+    # Decode the entities inline rather than through a re.sub callback
+    # so there is no python function call per entity.  Named entities
+    # are looked up by the whole match ("&amp;") in a single dict get.
+    parts = []
+    append = parts.append
+    last_end = 0
+    for m in _HTML_ENTITY_RE.finditer(value):
+        start, end = m.span()
+        append(value[last_end:start])
+        last_end = end
+        entity = m.group(0)
+        char = entity_map.get(entity)
+        if char is None:
+            char = entity
+            if entity[1] == '#':
+                try:
+                    if entity[2] in 'xX':
+                        char = unichr(int(entity[3:-1], 16))
+                    else:
+                        char = unichr(int(entity[2:-1]))
+                except ValueError:
+                    pass
+        append(char)
+    append(value[last_end:])
+    return ''.join(parts)
 
 
 # The fact that json_encode wraps json.dumps is an implementation detail.
@@ -91,9 +182,20 @@ def json_decode(value):
     return json.loads(to_basestring(value))
 
 
+_SQUEEZE_RE = re.compile(r"[\x00-\x20]+")
+_SQUEEZE_TABLE = dict((i, u(" ")) for i in range(0x21))
+
+
 def squeeze(value):
     """使用单个空格代替所有空格字符组成的序列."""
-    return re.sub(r"[\x00-\x20]+", " ", value).strip()
+    if isinstance(value, unicode_type):
+        # Map every control character to a space, then drop the empty
+        # strings that runs of spaces leave behind when splitting.
+        # Only " " is used as the separator: split() with no argument
+        # would also remove non-ascii whitespace from the middle.
+        parts = value.translate(_SQUEEZE_TABLE).split(" ")
+        return u(" ").join([p for p in parts if p]).strip()
+    return _SQUEEZE_RE.sub(" ", value).strip()
 
 
 def url_escape(value, plus=True):
@@ -106,8 +208,23 @@ def url_escape(value, plus=True):
     .. versionadded:: 3.1
         该 ``plus`` 参数
     """
-    quote = urllib_parse.quote_plus if plus else urllib_parse.quote
-    return quote(utf8(value))
+    value = utf8(value)
+    if plus:
+        # Deleting every safe byte leaves nothing if the value doesn't
+        # need quoting; bytes.translate does this scan in C.
+        if not value.translate(None, _URL_SAFE_BYTES_PLUS):
+            return native_str(value)
+        return urllib_parse.quote_plus(value)
+    if not value.translate(None, _URL_SAFE_BYTES):
+        return native_str(value)
+    return urllib_parse.quote(value)
+
+
+def _url_safe_bytes(quote):
+    # The set of bytes quote() leaves alone differs between python
+    # versions (e.g. "~"), so ask the function itself.
+    chars = (bytes(bytearray([i])) for i in range(256))
+    return b"".join(c for c in chars if utf8(quote(c)) == c)
 
 
 # python 3 changed things around enough that we need two separate
@@ -170,14 +287,36 @@ else:
         because it's too painful to keep them as byte strings in
         python3 and in practice they're nearly always ascii anyway.
         """
-        # This is gross, but python3 doesn't give us another way.
-        # Latin1 is the universal donor of character encodings.
-        result = _parse_qs(qs, keep_blank_values, strict_parsing,
-                           encoding='latin1', errors='strict')
-        encoded = {}
-        for k, v in result.items():
-            encoded[k] = [i.encode('latin1') for i in v]
-        return encoded
+        # Work on bytes throughout instead of decoding to latin1 str and
+        # encoding every value back again.  Latin1 is the universal donor
+        # of character encodings, so the results are the same.
+        if not qs and not strict_parsing:
+            return {}
+        if isinstance(qs, unicode_type):
+            qs = qs.encode('latin1')
+        unquote = urllib_parse.unquote_to_bytes
+        result = {}
+        for pair in qs.split(b'&'):
+            for name_value in (pair.split(b';') if _QS_SPLIT_SEMICOLON
+                               else (pair,)):
+                if not name_value and not strict_parsing:
+                    continue
+                name, sep, value = name_value.partition(b'=')
+                if not sep:
+                    if strict_parsing:
+                        raise ValueError("bad query field: %r" %
+                                         (name_value.decode('latin1'),))
+                    if not keep_blank_values:
+                        continue
+                if value or keep_blank_values:
+                    name = unquote(name.replace(b'+', b' ')).decode('latin1')
+                    value = unquote(value.replace(b'+', b' '))
+                    result.setdefault(name, []).append(value)
+        return result
+
+    # Older versions of the standard library also split query strings
+    # on semicolons; match whatever parse_qs does here.
+    _QS_SPLIT_SEMICOLON = 'b' in _parse_qs('a=1;b=2')
 
 
 _UTF8_TYPES = (bytes, type(None))
@@ -189,6 +328,13 @@ def utf8(value):
     如果该参数已经是一个字节字符串或None, 则原样返回.
     否则它必须是一个unicode 字符串并且被编码成utf8.
     """
+    # Exact type checks are cheaper than isinstance for the common
+    # cases; subclasses fall through to the isinstance checks below.
+    value_type = type(value)
+    if value_type is bytes or value is None:
+        return value
+    if value_type is unicode_type:
+        return value.encode("utf-8")
     if isinstance(value, _UTF8_TYPES):
         return value
     if not isinstance(value, unicode_type):
@@ -206,6 +352,11 @@ def to_unicode(value):
     如果该参数已经是一个unicode 字符串或None, 则原样返回.
     否则它必须是一个字节字符串并且被解码成utf8.
     """
+    value_type = type(value)
+    if value_type is unicode_type or value is None:
+        return value
+    if value_type is bytes:
+        return value.decode("utf-8")
     if isinstance(value, _TO_UNICODE_TYPES):
         return value
     if not isinstance(value, bytes):
@@ -225,6 +376,9 @@ if str is unicode_type:
 else:
     native_str = utf8
 
+_URL_SAFE_BYTES = _url_safe_bytes(urllib_parse.quote)
+_URL_SAFE_BYTES_PLUS = _url_safe_bytes(urllib_parse.quote_plus)
+
 _BASESTRING_TYPES = (basestring_type, type(None))
 
 
@@ -236,6 +390,9 @@ def to_basestring(value):
     可以使用和应该返回用户提供的类型. 在python3 中, 这两个类型
     不可以互换, 所以这个方法必须转换字节字符串为unicode 字符串.
     """
+    value_type = type(value)
+    if value_type is str or value_type is unicode_type or value is None:
+        return value
     if isinstance(value, _BASESTRING_TYPES):
         return value
     if not isinstance(value, bytes):
@@ -244,18 +401,26 @@ def to_basestring(value):
         )
     return value.decode("utf-8")
 
+if str is unicode_type:
+    # On python 3 basestring is str, so this is exactly to_unicode;
+    # use it directly rather than repeating the same checks.
+    to_basestring = to_unicode  # noqa
+
 
 def recursive_unicode(obj):
     """伴随一个简单的数据结构, 转换字节字符串为unicode 字符串.
 
     支持列表, 元组, 和字典.
     """
-    if isinstance(obj, dict):
-        return dict((recursive_unicode(k), recursive_unicode(v)) for (k, v) in obj.items())
+    if type(obj) is bytes:
+        return obj.decode("utf-8")
+    elif isinstance(obj, dict):
+        return {recursive_unicode(k): recursive_unicode(v)
+                for (k, v) in obj.items()}
     elif isinstance(obj, list):
-        return list(recursive_unicode(i) for i in obj)
+        return [recursive_unicode(i) for i in obj]
     elif isinstance(obj, tuple):
-        return tuple(recursive_unicode(i) for i in obj)
+        return tuple([recursive_unicode(i) for i in obj])
     elif isinstance(obj, bytes):
         return to_unicode(obj)
     else:
@@ -266,79 +431,74 @@ def recursive_unicode(obj):
 # but it gets all exponential on certain patterns (such as too many trailing
 # dots), causing the regex matcher to never return.
 # This regex should avoid those problems.
+# The regex is run on the raw (unescaped) text.  It accepts ``&`` and ``"``
+# inside urls but stops at ``<``, ``>`` and ``'``, which is equivalent to
+# accepting only the ``&amp;`` and ``&quot;`` entities in escaped text.
 # Use to_unicode instead of tornado.util.u - we don't want backslashes getting
 # processed as escapes.
-_URL_RE = re.compile(to_unicode(r"""\b((?:([\w-]+):(/{1,3})|www[.])(?:(?:(?:[^\s&()]|&amp;|&quot;)*(?:[^!"#$%&'()*+,.:;<=>?@\[\]^`{|}~\s]))|(?:\((?:[^\s&()]|&amp;|&quot;)*\)))+)"""))
-
-
-def linkify(text, shorten=False, extra_params="",
-            require_protocol=False, permitted_protocols=["http", "https"]):
-    """转换纯文本为带有链接的HTML.
-
-    例如: ``linkify("Hello http://tornadoweb.org!")`` 将返回
-    ``Hello <a href="http://tornadoweb.org">http://tornadoweb.org</a>!``
+_URL_RE = re.compile(to_unicode(r"""\b((?:([\w-]+):(/{1,3})|www[.])(?:(?:(?:[^\s()<>'])*(?:[^!"#$%&'()*+,.:;<=>?@\[\]^`{|}~\s]))|(?:\((?:[^\s()<>'])*\)))+)"""))
 
-    参数:
 
-    * ``shorten``: 长url 将被缩短展示.
+class _Linkifier(object):
+    """Replacement callable used by `linkify` for each matched URL.
 
-    * ``extra_params``: 额外的文本中的链接标签, 或一个可调用的
-        带有该链接作为一个参数并返回该额外的文本.
-        e.g. ``linkify(text, extra_params='rel="nofollow" class="external"')``,
-        或::
-
-            def extra_params_cb(url):
-                if url.startswith("http://example.com"):
-                    return 'class="internal"'
-                else:
-                    return 'class="external" rel="nofollow"'
-            linkify(text, extra_params=extra_params_cb)
-
-    * ``require_protocol``: 只有链接url 包括一个协议. 如果这是False,
-        例如www.facebook.com 这样的url 也将被linkified.
-
-    * ``permitted_protocols``: 协议的列表(或集合)应该被linkified,
-        e.g. ``linkify(text, permitted_protocols=["http", "ftp",
-        "mailto"])``. 这是非常不安全的, 包括协议, 比如 ``javascript``.
+    Options are stored in slots rather than closure cells so each match
+    only pays for a cheap attribute load.
     """
-    if extra_params and not callable(extra_params):
-        extra_params = " " + extra_params.strip()
-
-    def make_link(m):
-        url = m.group(1)
+    __slots__ = ('shorten', 'extra_params', 'extra_params_callable',
+                 'require_protocol', 'permitted_protocols')
+
+    def __init__(self, shorten, extra_params, require_protocol,
+                 permitted_protocols):
+        self.extra_params_callable = callable(extra_params)
+        if extra_params and not self.extra_params_callable:
+            extra_params = " " + extra_params.strip()
+        self.shorten = shorten
+        self.extra_params = extra_params
+        self.require_protocol = require_protocol
+        self.permitted_protocols = permitted_protocols
+
+    def __call__(self, m):
+        url = xhtml_escape(m.group(1))
         proto = m.group(2)
-        if require_protocol and not proto:
+        if self.require_protocol and not proto:
             return url  # not protocol, no linkify
 
-        if proto and proto not in permitted_protocols:
+        if proto and proto not in self.permitted_protocols:
             return url  # bad protocol, no linkify
 
-        href = m.group(1)
+        href = url
         if not proto:
             href = "http://" + href   # no proto specified, use http
 
-        if callable(extra_params):
-            params = " " + extra_params(href).strip()
+        if self.extra_params_callable:
+            params = " " + self.extra_params(href).strip()
         else:
-            params = extra_params
+            params = self.extra_params
 
         # clip long urls. max_len is just an approximation
         max_len = 30
-        if shorten and len(url) > max_len:
+        if self.shorten and len(url) > max_len:
             before_clip = url
             if proto:
                 proto_len = len(proto) + 1 + len(m.group(3) or "")  # +1 for :
             else:
                 proto_len = 0
 
-            parts = url[proto_len:].split("/")
-            if len(parts) > 1:
+            host_end = url.find("/", proto_len)
+            if host_end != -1:
                 # Grab the whole host part plus the first bit of the path
                 # The path is usually not that interesting once shortened
                 # (no more slug, etc), so it really just provides a little
                 # extra indication of shortening.
-                url = url[:proto_len] + parts[0] + "/" + \
-                    parts[1][:8].split('?')[0].split('.')[0]
+                path_end = url.find("/", host_end + 1)
+                if path_end == -1 or path_end > host_end + 9:
+                    path_end = host_end + 9
+                for sep in "?.":
+                    i = url.find(sep, host_end + 1, path_end)
+                    if i != -1:
+                        path_end = i
+                url = url[:path_end]
 
             if len(url) > max_len * 1.5:  # still too long
                 url = url[:max_len]
@@ -359,32 +519,58 @@ def linkify(text, shorten=False, extra_params="",
 
         return u('<a href="%s"%s>%s</a>') % (href, params, url)
 
-    # First HTML-escape so that our strings are all safe.
-    # The regex is modified to avoid character entites other than &amp; so
-    # that we won't pick up &quot;, etc.
-    text = _unicode(xhtml_escape(text))
-    return _URL_RE.sub(make_link, text)
 
+def linkify(text, shorten=False, extra_params="",
+            require_protocol=False, permitted_protocols=["http", "https"]):
+    """转换纯文本为带有链接的HTML.
 
-def _convert_entity(m):
-    if m.group(1) == "#":
-        try:
-            if m.group(2)[:1].lower() == 'x':
-                return unichr(int(m.group(2)[1:], 16))
-            else:
-                return unichr(int(m.group(2)))
-        except ValueError:
-            return "&#%s;" % m.group(2)
-    try:
-        return _HTML_UNICODE_MAP[m.group(2)]
-    except KeyError:
-        return "&%s;" % m.group(2)
+    例如: ``linkify("Hello http://tornadoweb.org!")`` 将返回
+    ``Hello <a href="http://tornadoweb.org">http://tornadoweb.org</a>!``
 
+    参数:
+
+    * ``shorten``: 长url 将被缩短展示.
 
-def _build_unicode_map():
-    unicode_map = {}
+    * ``extra_params``: 额外的文本中的链接标签, 或一个可调用的
+        带有该链接作为一个参数并返回该额外的文本.
+        e.g. ``linkify(text, extra_params='rel="nofollow" class="external"')``,
+        或::
+
+            def extra_params_cb(url):
+                if url.startswith("http://example.com"):
+                    return 'class="internal"'
+                else:
+                    return 'class="external" rel="nofollow"'
+            linkify(text, extra_params=extra_params_cb)
+
+    * ``require_protocol``: 只有链接url 包括一个协议. 如果这是False,
+        例如www.facebook.com 这样的url 也将被linkified.
+
+    * ``permitted_protocols``: 协议的列表(或集合)应该被linkified,
+        e.g. ``linkify(text, permitted_protocols=["http", "ftp",
+        "mailto"])``. 这是非常不安全的, 包括协议, 比如 ``javascript``.
+    """
+    linker = _Linkifier(shorten, extra_params, require_protocol,
+                        permitted_protocols)
+    # Find the urls and HTML-escape the text in a single pass: the text
+    # between matches is escaped here and the urls are escaped by linker.
+    text = _unicode(text)
+    parts = []
+    append = parts.append
+    last_end = 0
+    for m in _URL_RE.finditer(text):
+        start, end = m.span()
+        append(xhtml_escape(text[last_end:start]))
+        append(linker(m))
+        last_end = end
+    append(xhtml_escape(text[last_end:]))
+    return "".join(parts)
+
+
+def _build_entity_map():
+    entity_map = {}
     for name, value in htmlentitydefs.name2codepoint.items():
-        unicode_map[name] = unichr(value)
-    return unicode_map
+        entity_map['&%s;' % name] = unichr(value)
+    return entity_map
 
-_HTML_UNICODE_MAP = _build_unicode_map()
+_HTML_ENTITY_MAP = None
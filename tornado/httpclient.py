@@ -37,13 +37,12 @@ http://curl.haxx.se/libcurl/c/curl_easy_setopt.html#CURLOPTCONNECTTIMEOUTMS
 
 from __future__ import absolute_import, division, print_function, with_statement
 
-import functools
 import time
 import weakref
 
 from tornado.concurrent import TracebackFuture
 from tornado.escape import utf8, native_str
-from tornado import httputil, stack_context
+from tornado import gen, httputil, stack_context
 from tornado.ioloop import IOLoop
 from tornado.util import Configurable
 
@@ -95,8 +94,8 @@ class HTTPClient(object):
         如果在 fetch 过程中发生错误, 我们将抛出一个 `HTTPError` 除非
         ``raise_error`` 关键字参数被设置为 False.
         """
-        response = self._io_loop.run_sync(functools.partial(
-            self._async_client.fetch, request, **kwargs))
+        response = self._io_loop.run_sync(
+            lambda: self._async_client.fetch(request, **kwargs))
         return response
 
 
@@ -144,10 +143,13 @@ class AsyncHTTPClient(Configurable):
 
     @classmethod
     def _async_clients(cls):
-        attr_name = '_async_client_dict_' + cls.__name__
-        if not hasattr(cls, attr_name):
-            setattr(cls, attr_name, weakref.WeakKeyDictionary())
-        return getattr(cls, attr_name)
+        # Each class gets its own cache, so only look in the class's
+        # own __dict__ (not its bases).
+        instance_cache = cls.__dict__.get('_async_client_dict')
+        if instance_cache is None:
+            instance_cache = weakref.WeakKeyDictionary()
+            cls._async_client_dict = instance_cache
+        return instance_cache
 
     def __new__(cls, io_loop=None, force_instance=False, **kwargs):
         io_loop = io_loop or IOLoop.current()
@@ -155,8 +157,11 @@ class AsyncHTTPClient(Configurable):
             instance_cache = None
         else:
             instance_cache = cls._async_clients()
-        if instance_cache is not None and io_loop in instance_cache:
-            return instance_cache[io_loop]
+            # A single get() instead of "in" plus [], since every
+            # WeakKeyDictionary lookup has to create a weakref.
+            instance = instance_cache.get(io_loop)
+            if instance is not None:
+                return instance
         instance = super(AsyncHTTPClient, cls).__new__(cls, io_loop=io_loop,
                                                        **kwargs)
         # Make sure the instance knows which cache to remove itself from.
@@ -215,10 +220,16 @@ class AsyncHTTPClient(Configurable):
             raise RuntimeError("fetch() called on closed AsyncHTTPClient")
         if not isinstance(request, HTTPRequest):
             request = HTTPRequest(url=request, **kwargs)
-        # We may modify this (to add Host, Accept-Encoding, etc),
-        # so make sure we don't modify the caller's object.  This is also
-        # where normal dicts get converted to HTTPHeaders objects.
-        request.headers = httputil.HTTPHeaders(request.headers)
+            # Without a headers argument the request has a fresh
+            # HTTPHeaders object of its own, so there is nothing to copy.
+            copy_headers = kwargs.get('headers') is not None
+        else:
+            copy_headers = True
+        if copy_headers:
+            # We may modify this (to add Host, Accept-Encoding, etc),
+            # so make sure we don't modify the caller's object.  This is
+            # also where normal dicts get converted to HTTPHeaders objects.
+            request.headers = httputil.HTTPHeaders(request.headers)
         request = _RequestProxy(request, self.defaults)
         future = TracebackFuture()
         if callback is not None:
@@ -237,14 +248,38 @@ class AsyncHTTPClient(Configurable):
                 self.io_loop.add_callback(callback, response)
             future.add_done_callback(handle_future)
 
-        def handle_response(response):
-            if raise_error and response.error:
-                future.set_exception(response.error)
-            else:
-                future.set_result(response)
+        if raise_error:
+            def handle_response(response):
+                if response.error:
+                    future.set_exception(response.error)
+                else:
+                    future.set_result(response)
+        else:
+            # Every response becomes the result, so hand the future's
+            # own method to fetch_impl and skip the wrapper entirely.
+            handle_response = future.set_result
         self.fetch_impl(request, handle_response)
         return future
 
+    def fetch_many(self, requests, raise_error=True, **kwargs):
+        """并行执行多个请求, 返回一个结果为 `HTTPResponse` 列表的
+        `.Future` 对象.
+
+        ``requests`` 中的每一项都可以是一个字符串 URL 或 `HTTPRequest`
+        对象, ``kwargs`` 和 ``raise_error`` 的含义与 `fetch` 相同.
+        所有请求都会在返回之前被提交给实现类, 响应列表的顺序和
+        ``requests`` 的顺序相同.
+
+        如果 ``raise_error`` 为 True (默认), 只要有一个请求失败, 返回的
+        ``Future`` 就会抛出第一个 `HTTPError`.
+
+        .. versionadded:: 4.4
+        """
+        return gen.multi([self.fetch(request, raise_error=raise_error,
+                                     **kwargs)
+                          for request in requests],
+                         quiet_exceptions=HTTPError)
+
     def fetch_impl(self, request, callback):
         raise NotImplementedError()
 
@@ -261,6 +296,11 @@ class AsyncHTTPClient(Configurable):
         并行执行的 `~AsyncHTTPClient.fetch()` 操作的最大数量. 根据使用的
         实现类不同, 可能支持其他参数.
 
+        ``SimpleAsyncHTTPClient`` 默认不重用连接; 使用关键字参数
+        ``max_keepalive_connections`` 和 ``keepalive_timeout`` 可以保留空闲
+        连接供之后对同一主机的请求使用 (``curl_httpclient`` 总是由 libcurl
+        重用连接).
+
         例如::
 
            AsyncHTTPClient.configure("tornado.curl_httpclient.CurlAsyncHTTPClient")
@@ -271,6 +311,21 @@ class AsyncHTTPClient(Configurable):
 class HTTPRequest(object):
     """HTTP 客户端请求对象."""
 
+    # One request object is created per fetch (and per redirect), so
+    # avoid giving each of them an instance dict.
+    __slots__ = (
+        '_headers', 'proxy_host', 'proxy_port', 'proxy_username',
+        'proxy_password', 'url', 'method', '_body', '_body_producer',
+        'auth_username', 'auth_password', 'auth_mode', 'connect_timeout',
+        'request_timeout', 'follow_redirects', 'max_redirects',
+        'user_agent', 'decompress_response', 'network_interface',
+        '_streaming_callback', '_header_callback', '_prepare_curl_callback',
+        'allow_nonstandard_methods', 'validate_cert', 'ca_certs',
+        'allow_ipv6', 'client_key', 'client_cert', 'ssl_options',
+        'expect_100_continue', 'start_time',
+        # Set by simple_httpclient on the requests made for redirects.
+        'original_request')
+
     # Default values for HTTPRequest parameters.
     # Merged with the values on the request object by AsyncHTTPClient
     # implementations.
@@ -387,11 +442,14 @@ class HTTPRequest(object):
         .. versionadded:: 4.2
            ``ssl_options`` 参数.
         """
-        # Note that some of these attributes go through property setters
-        # defined below.
-        self.headers = headers
+        # The attributes with property setters (defined below) are
+        # assigned to their backing fields directly; the setters are
+        # only needed for changes made after construction.
+        if headers is None:
+            headers = httputil.HTTPHeaders()
+        self._headers = headers
         if if_modified_since:
-            self.headers["If-Modified-Since"] = httputil.format_timestamp(
+            headers["If-Modified-Since"] = httputil.format_timestamp(
                 if_modified_since)
         self.proxy_host = proxy_host
         self.proxy_port = proxy_port
@@ -399,8 +457,12 @@ class HTTPRequest(object):
         self.proxy_password = proxy_password
         self.url = url
         self.method = method
-        self.body = body
-        self.body_producer = body_producer
+        if body is not None and type(body) is not bytes:
+            body = utf8(body)
+        self._body = body
+        if body_producer is not None:
+            body_producer = stack_context.wrap(body_producer)
+        self._body_producer = body_producer
         self.auth_username = auth_username
         self.auth_password = auth_password
         self.auth_mode = auth_mode
@@ -414,9 +476,15 @@ class HTTPRequest(object):
         else:
             self.decompress_response = use_gzip
         self.network_interface = network_interface
-        self.streaming_callback = streaming_callback
-        self.header_callback = header_callback
-        self.prepare_curl_callback = prepare_curl_callback
+        if streaming_callback is not None:
+            streaming_callback = stack_context.wrap(streaming_callback)
+        self._streaming_callback = streaming_callback
+        if header_callback is not None:
+            header_callback = stack_context.wrap(header_callback)
+        self._header_callback = header_callback
+        if prepare_curl_callback is not None:
+            prepare_curl_callback = stack_context.wrap(prepare_curl_callback)
+        self._prepare_curl_callback = prepare_curl_callback
         self.allow_nonstandard_methods = allow_nonstandard_methods
         self.validate_cert = validate_cert
         self.ca_certs = ca_certs
@@ -444,7 +512,10 @@ class HTTPRequest(object):
 
     @body.setter
     def body(self, value):
-        self._body = utf8(value)
+        # Bodies are usually None or bytes already; skip the call.
+        if value is not None and type(value) is not bytes:
+            value = utf8(value)
+        self._body = value
 
     @property
     def body_producer(self):
@@ -452,7 +523,13 @@ class HTTPRequest(object):
 
     @body_producer.setter
     def body_producer(self, value):
-        self._body_producer = stack_context.wrap(value)
+        # The callback attributes are usually None; skip the call to
+        # wrap() for them.  (wrap() must not be skipped otherwise, even
+        # with no active contexts, since it resets the contexts that
+        # are active when the callback runs.)
+        if value is not None:
+            value = stack_context.wrap(value)
+        self._body_producer = value
 
     @property
     def streaming_callback(self):
@@ -460,7 +537,9 @@ class HTTPRequest(object):
 
     @streaming_callback.setter
     def streaming_callback(self, value):
-        self._streaming_callback = stack_context.wrap(value)
+        if value is not None:
+            value = stack_context.wrap(value)
+        self._streaming_callback = value
 
     @property
     def header_callback(self):
@@ -468,7 +547,9 @@ class HTTPRequest(object):
 
     @header_callback.setter
     def header_callback(self, value):
-        self._header_callback = stack_context.wrap(value)
+        if value is not None:
+            value = stack_context.wrap(value)
+        self._header_callback = value
 
     @property
     def prepare_curl_callback(self):
@@ -476,7 +557,14 @@ class HTTPRequest(object):
 
     @prepare_curl_callback.setter
     def prepare_curl_callback(self, value):
-        self._prepare_curl_callback = stack_context.wrap(value)
+        if value is not None:
+            value = stack_context.wrap(value)
+        self._prepare_curl_callback = value
+
+
+# The standard reason phrases, looked up whenever a response or error
+# is created without one.  Bound once to skip the attribute lookups.
+_responses_get = httputil.responses.get
 
 
 class HTTPResponse(object):
@@ -498,6 +586,9 @@ class HTTPResponse(object):
 
     * body: string 化的响应体 (从 ``self.buffer`` 的需求创建)
 
+    * body_view: 响应体的只读 ``memoryview``, 在 Python 3.8+ 上不会复制
+      ``self.buffer`` 的内容 (4.4 新增)
+
     * error: 任何异常对象
 
     * request_time: 请求开始到结束的时间(秒)
@@ -508,6 +599,13 @@ class HTTPResponse(object):
       加上 ``queue``, 这是通过等待在 `AsyncHTTPClient` 的 ``max_clients``
       设置下的插槽引入的延迟(如果有的话).
     """
+    __slots__ = ('request', 'code', 'reason', '_headers', 'buffer', '_body',
+                 'effective_url', 'error', 'request_time', '_time_info')
+    # The attributes __repr__ has always shown, in the sorted order of
+    # the instance dict used before __slots__; built once per class.
+    _REPR_KEYS = ('_body', 'buffer', 'code', 'effective_url', 'error',
+                  'headers', 'reason', 'request', 'request_time', 'time_info')
+
     def __init__(self, request, code, headers=None, buffer=None,
                  effective_url=None, error=None, request_time=None,
                  time_info=None, reason=None):
@@ -516,11 +614,10 @@ class HTTPResponse(object):
         else:
             self.request = request
         self.code = code
-        self.reason = reason or httputil.responses.get(code, "Unknown")
-        if headers is not None:
-            self.headers = headers
-        else:
-            self.headers = httputil.HTTPHeaders()
+        self.reason = reason or _responses_get(code, "Unknown")
+        # headers and time_info are created on first access when not
+        # given; error responses and many callers never look at them.
+        self._headers = headers
         self.buffer = buffer
         self._body = None
         if effective_url is None:
@@ -528,15 +625,35 @@ class HTTPResponse(object):
         else:
             self.effective_url = effective_url
         if error is None:
-            if self.code < 200 or self.code >= 300:
-                self.error = HTTPError(self.code, message=self.reason,
-                                       response=self)
-            else:
+            if 200 <= code < 300:
                 self.error = None
+            else:
+                self.error = HTTPError(code, message=self.reason,
+                                       response=self)
         else:
             self.error = error
         self.request_time = request_time
-        self.time_info = time_info or {}
+        self._time_info = time_info or None
+
+    @property
+    def headers(self):
+        if self._headers is None:
+            self._headers = httputil.HTTPHeaders()
+        return self._headers
+
+    @headers.setter
+    def headers(self, value):
+        self._headers = value
+
+    @property
+    def time_info(self):
+        if self._time_info is None:
+            self._time_info = {}
+        return self._time_info
+
+    @time_info.setter
+    def time_info(self, value):
+        self._time_info = value
 
     def _get_body(self):
         if self.buffer is None:
@@ -548,13 +665,43 @@ class HTTPResponse(object):
 
     body = property(_get_body)
 
+    @property
+    def body_view(self):
+        """响应体的只读 ``memoryview``.
+
+        在 Python 3.8+ 上它直接引用 ``self.buffer`` 的内容, 所以只需要读取
+        (或切片) 响应体的调用者可以避免像 ``body`` 那样复制一份大的
+        响应体. 只要这个视图 (或它的切片) 还存在, ``self.buffer`` 就不能
+        改变大小, 例如 ``write`` 或 ``truncate`` 将抛出 `BufferError`;
+        用完后可以调用视图的 ``release()`` 方法. 在其他 Python 版本上
+        (或已经访问过 ``body`` 时) 它是基于 ``body`` 的视图.
+
+        .. versionadded:: 4.4
+        """
+        if self.buffer is None:
+            return None
+        if self._body is None:
+            getbuffer = getattr(self.buffer, 'getbuffer', None)  # py3
+            if getbuffer is not None:
+                view = getbuffer()
+                toreadonly = getattr(view, 'toreadonly', None)  # py3.8+
+                if toreadonly is not None:
+                    readonly = toreadonly()
+                    # The read-only view keeps the buffer exported on
+                    # its own, so the writable one can go.
+                    view.release()
+                    return readonly
+                view.release()
+        return memoryview(self.body)
+
     def rethrow(self):
         """如果请求中有错误发生, 将抛出一个 `HTTPError`."""
         if self.error:
             raise self.error
 
     def __repr__(self):
-        args = ",".join("%s=%r" % i for i in sorted(self.__dict__.items()))
+        args = ",".join(["%s=%r" % (name, getattr(self, name))
+                         for name in self._REPR_KEYS])
         return "%s(%s)" % (self.__class__.__name__, args)
 
 
@@ -574,7 +721,7 @@ class HTTPError(Exception):
     """
     def __init__(self, code, message=None, response=None):
         self.code = code
-        self.message = message or httputil.responses.get(code, "Unknown")
+        self.message = message or _responses_get(code, "Unknown")
         self.response = response
         super(HTTPError, self).__init__(code, message, response)
 
@@ -592,13 +739,15 @@ class _RequestProxy(object):
         self.defaults = defaults
 
     def __getattr__(self, name):
-        request_attr = getattr(self.request, name)
-        if request_attr is not None:
-            return request_attr
-        elif self.defaults is not None:
-            return self.defaults.get(name, None)
-        else:
-            return None
+        value = getattr(self.request, name)
+        if value is None and self.defaults is not None:
+            value = self.defaults.get(name, None)
+        # Remember the merged value so that later lookups of the same
+        # attribute are plain instance dict hits and never reach
+        # __getattr__ again.  Implementations read the same few
+        # attributes many times per request.
+        self.__dict__[name] = value
+        return value
 
 
 def main():
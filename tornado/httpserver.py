@@ -135,6 +135,9 @@ class HTTPServer(TCPServer, Configurable,
                    idle_connection_timeout=None, body_timeout=None,
                    max_body_size=None, max_buffer_size=None):
         self.request_callback = request_callback
+        # Checked once here rather than in every _ServerRequestAdapter.
+        self._callback_is_delegate = isinstance(
+            request_callback, httputil.HTTPServerConnectionDelegate)
         self.no_keep_alive = no_keep_alive
         self.xheaders = xheaders
         self.protocol = protocol
@@ -161,9 +164,12 @@ class HTTPServer(TCPServer, Configurable,
     @gen.coroutine
     def close_all_connections(self):
         while self._connections:
-            # Peek at an arbitrary element of the set
-            conn = next(iter(self._connections))
-            yield conn.close()
+            # Close a snapshot of the set; peeking with next(iter())
+            # after each close rescans the emptied slots of the set and
+            # is quadratic in the number of connections.  The outer loop
+            # picks up anything that was added in the meantime.
+            for conn in list(self._connections):
+                yield conn.close()
 
     def handle_stream(self, stream, address):
         context = _HTTPRequestContext(stream, address,
@@ -186,12 +192,14 @@ class _HTTPRequestContext(object):
         # Save the socket's address family now so we know how to
         # interpret self.address even after the stream is closed
         # and its socket attribute replaced with None.
-        if stream.socket is not None:
-            self.address_family = stream.socket.family
+        sock = stream.socket
+        if sock is not None:
+            address_family = sock.family
         else:
-            self.address_family = None
+            address_family = None
+        self.address_family = address_family
         # In HTTPServerRequest we want an IP, not a full socket address.
-        if (self.address_family in (socket.AF_INET, socket.AF_INET6) and
+        if (address_family in (socket.AF_INET, socket.AF_INET6) and
                 address is not None):
             self.remote_ip = address[0]
         else:
@@ -219,16 +227,20 @@ class _HTTPRequestContext(object):
 
     def _apply_xheaders(self, headers):
         """Rewrite the ``remote_ip`` and ``protocol`` fields."""
-        # Squid uses X-Forwarded-For, others use X-Real-Ip
-        ip = headers.get("X-Forwarded-For", self.remote_ip)
-        ip = ip.split(',')[-1].strip()
-        ip = headers.get("X-Real-Ip", ip)
-        if netutil.is_valid_ip(ip):
+        # Squid uses X-Forwarded-For, others use X-Real-Ip.  Most
+        # requests have neither, so only validate an address that
+        # actually came from a header.
+        ip = headers.get("X-Real-Ip")
+        if ip is None:
+            ip = headers.get("X-Forwarded-For")
+            if ip is not None:
+                ip = ip.rpartition(',')[2].strip()
+        if ip is not None and netutil.is_valid_ip(ip):
             self.remote_ip = ip
         # AWS uses X-Forwarded-Proto
-        proto_header = headers.get(
-            "X-Scheme", headers.get("X-Forwarded-Proto",
-                                    self.protocol))
+        proto_header = headers.get("X-Scheme")
+        if proto_header is None:
+            proto_header = headers.get("X-Forwarded-Proto")
         if proto_header in ("http", "https"):
             self.protocol = proto_header
 
@@ -250,8 +262,7 @@ class _ServerRequestAdapter(httputil.HTTPMessageDelegate):
         self.server = server
         self.connection = request_conn
         self.request = None
-        if isinstance(server.request_callback,
-                      httputil.HTTPServerConnectionDelegate):
+        if server._callback_is_delegate:
             self.delegate = server.request_callback.start_request(
                 server_conn, request_conn)
             self._chunks = None
@@ -127,17 +127,38 @@ class HTTPHeaders(collections.MutableMapping):
     Set-Cookie: C=D
     """
     def __init__(self, *args, **kwargs):
-        self._dict = {}
-        self._as_list = {}
-        self._last_key = None
         if (len(args) == 1 and len(kwargs) == 0 and
                 isinstance(args[0], HTTPHeaders)):
-            # Copy constructor
-            for k, v in args[0].get_all():
-                self.add(k, v)
+            # Copy constructor.  The source is already normalized, so
+            # its dicts can be copied directly instead of re-adding
+            # each value.  The value lists are copied so the two
+            # objects stay independent.
+            other = args[0]
+            self._dict = dict(other._dict)
+            self._as_list = as_list = {}
+            for k, v in other._as_list.items():
+                as_list[k] = list(v)
+            self._last_key = other._last_key
         else:
             # Dict-style initialization
-            self.update(*args, **kwargs)
+            self._dict = {}
+            self._as_list = {}
+            self._last_key = None
+            if len(args) == 1 and not kwargs and type(args[0]) is dict:
+                # Plain dicts (the usual ``headers={...}`` argument)
+                # skip the generic MutableMapping.update machinery.
+                self._update_from_dict(args[0])
+            elif args or kwargs:
+                self.update(*args, **kwargs)
+
+    def _update_from_dict(self, d):
+        normalized = _normalized_headers
+        dict_ = self._dict
+        as_list = self._as_list
+        for name, value in d.items():
+            norm_name = normalized[name]
+            dict_[norm_name] = value
+            as_list[norm_name] = [value]
 
     # new public methods
 
@@ -59,6 +59,15 @@ _supported_locales = frozenset([_default_locale])
 _use_gettext = False
 CONTEXT_SEPARATOR = "\x04"
 
+# File names accepted by load_translations, minus the .csv extension.
+_CSV_LOCALE_RE = re.compile(r"[a-z]+(_[A-Z]+)?$")
+
+# Languages written right to left, by two-letter code prefix.
+_RTL_LANGUAGES = frozenset(["fa", "ar", "he"])
+
+# Morning/afternoon markers used by zh_CN's 12-hour clock.
+_ZH_CN_AMPM = (u('\u4e0a\u5348'), u('\u4e0b\u5348'))
+
 
 def get(*locale_codes):
     """返回给定区域代码的最近匹配.
@@ -124,8 +133,8 @@ def load_translations(directory, encoding=None):
     for path in os.listdir(directory):
         if not path.endswith(".csv"):
             continue
-        locale, extension = path.split(".")
-        if not re.match("[a-z]+(_[A-Z]+)?$", locale):
+        locale = path[:-4]
+        if not _CSV_LOCALE_RE.match(locale):
             gen_log.error("Unrecognized locale %r (path: %s)", locale,
                           os.path.join(directory, path))
             continue
@@ -145,6 +154,7 @@ def load_translations(directory, encoding=None):
             # python 3: csv.reader requires a file open in text mode.
             # Force utf8 to avoid dependence on $LANG environment variable.
             f = open(full_path, "r", encoding=encoding)
+            decode = False
         except TypeError:
             # python 2: csv can only handle byte strings (in ascii-compatible
             # encodings), which we decode below. Transcode everything into
@@ -153,22 +163,26 @@ def load_translations(directory, encoding=None):
             with codecs.open(full_path, "r", encoding=encoding) as infile:
                 f.write(escape.utf8(infile.read()))
             f.seek(0)
-        _translations[locale] = {}
+            decode = True
+        buckets = {"plural": {}, "singular": {}, "unknown": {}}
         for i, row in enumerate(csv.reader(f)):
             if not row or len(row) < 2:
                 continue
-            row = [escape.to_unicode(c).strip() for c in row]
-            english, translation = row[:2]
-            if len(row) > 2:
-                plural = row[2] or "unknown"
-            else:
-                plural = "unknown"
-            if plural not in ("plural", "singular", "unknown"):
+            if decode:
+                row = [escape.to_unicode(c) for c in row[:3]]
+            english = row[0].strip()
+            translation = row[1].strip()
+            plural = len(row) > 2 and row[2].strip() or "unknown"
+            bucket = buckets.get(plural)
+            if bucket is None:
                 gen_log.error("Unrecognized plural indicator %r in %s line %d",
                               plural, path, i + 1)
                 continue
-            _translations[locale].setdefault(plural, {})[english] = translation
+            bucket[english] = translation
         f.close()
+        _translations[locale] = dict((plural, bucket)
+                                     for plural, bucket in buckets.items()
+                                     if bucket)
     _supported_locales = frozenset(list(_translations.keys()) + [_default_locale])
     gen_log.debug("Supported locales: %s", sorted(_supported_locales))
 
@@ -268,14 +282,15 @@ class Locale(object):
     def __init__(self, code, translations):
         self.code = code
         self.name = LOCALE_NAMES.get(code, {}).get("name", u("Unknown"))
-        self.rtl = False
-        for prefix in ["fa", "ar", "he"]:
-            if self.code.startswith(prefix):
-                self.rtl = True
-                break
+        self.rtl = code[:2] in _RTL_LANGUAGES
         self.translations = translations
 
-        # Initialize strings for date formatting
+        # Strings for date formatting are translated on first use, since
+        # many locales never format a date.
+        self._months = None
+        self._weekdays = None
+
+    def _load_date_names(self):
         _ = self.translate
         self._months = [
             _("January"), _("February"), _("March"), _("April"),
@@ -322,30 +337,32 @@ class Locale(object):
             else:
                 # Otherwise, future dates always use the full format.
                 full_format = True
-        local_date = date - datetime.timedelta(minutes=gmt_offset)
-        local_now = now - datetime.timedelta(minutes=gmt_offset)
-        local_yesterday = local_now - datetime.timedelta(hours=24)
         difference = now - date
         seconds = difference.seconds
         days = difference.days
 
         _ = self.translate
+        if not full_format and relative and days == 0:
+            if seconds < 50:
+                return _("1 second ago", "%(seconds)d seconds ago",
+                         seconds) % {"seconds": seconds}
+
+            if seconds < 50 * 60:
+                minutes = round(seconds / 60.0)
+                return _("1 minute ago", "%(minutes)d minutes ago",
+                         minutes) % {"minutes": minutes}
+
+            hours = round(seconds / (60.0 * 60))
+            return _("1 hour ago", "%(hours)d hours ago",
+                     hours) % {"hours": hours}
+
+        # The relative strings above don't need local times; compute them
+        # only for the absolute formats below.
+        local_date = date - datetime.timedelta(minutes=gmt_offset)
+        local_now = now - datetime.timedelta(minutes=gmt_offset)
+        local_yesterday = local_now - datetime.timedelta(hours=24)
         format = None
         if not full_format:
-            if relative and days == 0:
-                if seconds < 50:
-                    return _("1 second ago", "%(seconds)d seconds ago",
-                             seconds) % {"seconds": seconds}
-
-                if seconds < 50 * 60:
-                    minutes = round(seconds / 60.0)
-                    return _("1 minute ago", "%(minutes)d minutes ago",
-                             minutes) % {"minutes": minutes}
-
-                hours = round(seconds / (60.0 * 60))
-                return _("1 hour ago", "%(hours)d hours ago",
-                         hours) % {"hours": hours}
-
             if days == 0:
                 format = _("%(time)s")
             elif days == 1 and local_date.day == local_yesterday.day and \
@@ -363,12 +380,14 @@ class Locale(object):
             format = _("%(month_name)s %(day)s, %(year)s") if shorter else \
                 _("%(month_name)s %(day)s, %(year)s at %(time)s")
 
+        if self._months is None:
+            self._load_date_names()
         tfhour_clock = self.code not in ("en", "en_US", "zh_CN")
         if tfhour_clock:
             str_time = "%d:%02d" % (local_date.hour, local_date.minute)
         elif self.code == "zh_CN":
             str_time = "%s%d:%02d" % (
-                (u('\u4e0a\u5348'), u('\u4e0b\u5348'))[local_date.hour >= 12],
+                _ZH_CN_AMPM[local_date.hour >= 12],
                 local_date.hour % 12 or 12, local_date.minute)
         else:
             str_time = "%d:%02d %s" % (
@@ -390,6 +409,8 @@ class Locale(object):
         ``dow=False``.
         """
         local_date = date - datetime.timedelta(minutes=gmt_offset)
+        if self._months is None:
+            self._load_date_names()
         _ = self.translate
         if dow:
             return _("%(weekday)s, %(month_name)s %(day)s") % {
@@ -423,6 +444,8 @@ class Locale(object):
         """返回给定整数的一个由逗号分隔的字符串."""
         if self.code not in ("en", "en_US"):
             return str(value)
+        if isinstance(value, numbers.Integral):
+            return format(value, ",")
         value = str(value)
         parts = []
         while value:
@@ -438,11 +461,15 @@ class CSVLocale(Locale):
             assert count is not None
             if count != 1:
                 message = plural_message
-                message_dict = self.translations.get("plural", {})
+                message_dict = self.translations.get("plural")
             else:
-                message_dict = self.translations.get("singular", {})
+                message_dict = self.translations.get("singular")
         else:
-            message_dict = self.translations.get("unknown", {})
+            message_dict = self.translations.get("unknown")
+        if message_dict is None:
+            # No translations of this kind (always the case for the
+            # default locale).
+            return message
         return message_dict.get(message, message)
 
     def pgettext(self, context, message, plural_message=None, count=None):
@@ -495,17 +522,15 @@ class GettextLocale(Locale):
         """
         if plural_message is not None:
             assert count is not None
-            msgs_with_ctxt = ("%s%s%s" % (context, CONTEXT_SEPARATOR, message),
-                              "%s%s%s" % (context, CONTEXT_SEPARATOR, plural_message),
-                              count)
-            result = self.ngettext(*msgs_with_ctxt)
+            prefix = context + CONTEXT_SEPARATOR
+            result = self.ngettext(prefix + message, prefix + plural_message,
+                                   count)
             if CONTEXT_SEPARATOR in result:
                 # Translation not found
                 result = self.ngettext(message, plural_message, count)
             return result
         else:
-            msg_with_ctxt = "%s%s%s" % (context, CONTEXT_SEPARATOR, message)
-            result = self.gettext(msg_with_ctxt)
+            result = self.gettext(context + CONTEXT_SEPARATOR + message)
             if CONTEXT_SEPARATOR in result:
                 # Translation not found
                 result = message
@@ -19,12 +19,14 @@
 from __future__ import absolute_import, division, print_function, with_statement
 
 import errno
+import functools
 import os
 import sys
 import socket
 import stat
 
-from tornado.concurrent import dummy_executor, run_on_executor
+from tornado.concurrent import (dummy_executor, return_future,
+                                run_on_executor)
 from tornado.ioloop import IOLoop
 from tornado.platform.auto import set_close_exec
 from tornado.util import u, Configurable, errno_from_exception
@@ -311,6 +313,7 @@ class Resolver(Configurable):
     * `tornado.netutil.BlockingResolver`
     * `tornado.netutil.ThreadedResolver`
     * `tornado.netutil.OverrideResolver`
+    * `tornado.netutil.CachingResolver`
     * `tornado.platform.twisted.TwistedResolver`
     * `tornado.platform.caresresolver.CaresResolver`
     """
@@ -458,6 +461,71 @@ class OverrideResolver(Resolver):
         return self.resolver.resolve(host, port, *args, **kwargs)
 
 
+class CachingResolver(Resolver):
+    """Wraps a resolver and caches its results for ``ttl`` seconds.
+
+    `.SimpleAsyncHTTPClient` resolves the host again for every new
+    connection; clients that talk to the same few hosts can avoid
+    repeating the lookup by giving it a caching resolver::
+
+        resolver = CachingResolver(ThreadedResolver(), ttl=60)
+        client = AsyncHTTPClient(resolver=resolver)
+
+    Failed lookups are not cached.  At most ``max_entries`` results are
+    kept; when the cache is full, expired entries are dropped first and
+    the whole cache is cleared if that is not enough.
+
+    .. versionadded:: 4.4
+    """
+    def initialize(self, resolver, ttl=60.0, max_entries=1000):
+        self.resolver = resolver
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._cache = {}
+        # Lookups in flight, so that concurrent misses for the same
+        # host share one call to the wrapped resolver.
+        self._pending = {}
+
+    def close(self):
+        self.resolver.close()
+        self._cache.clear()
+        self._pending.clear()
+
+    @return_future
+    def resolve(self, host, port, family=socket.AF_UNSPEC, callback=None):
+        io_loop = IOLoop.current()
+        now = io_loop.time()
+        key = (host, port, family)
+        entry = self._cache.get(key)
+        if entry is not None and entry[1] > now:
+            callback(entry[0])
+            return
+        future = self._pending.get(key)
+        if future is None:
+            future = self.resolver.resolve(host, port, family)
+            self._pending[key] = future
+            # Registered before any waiter's callback, so the cache is
+            # filled by the time the waiters run.
+            io_loop.add_future(future, functools.partial(
+                self._on_resolved, key, now + self.ttl))
+        io_loop.add_future(future, lambda future: callback(future.result()))
+
+    def _on_resolved(self, key, expires, future):
+        if self._pending.get(key) is future:
+            del self._pending[key]
+        if future.exception() is not None:
+            return
+        cache = self._cache
+        if key not in cache and len(cache) >= self.max_entries:
+            now = IOLoop.current().time()
+            for k, (_, t) in list(cache.items()):
+                if t <= now:
+                    del cache[k]
+            if len(cache) >= self.max_entries:
+                cache.clear()
+        cache[key] = (future.result(), expires)
+
+
 # These are the keyword arguments to ssl.wrap_socket that must be translated
 # to their SSLContext equivalents (the other arguments are still passed
 # to SSLContext.wrap_socket).
@@ -19,6 +19,7 @@ import functools
 import re
 import socket
 import sys
+import time
 from io import BytesIO
 
 
@@ -52,13 +53,14 @@ class SimpleAsyncHTTPClient(AsyncHTTPClient):
     This class implements an HTTP 1.1 client on top of Tornado's IOStreams.
     Some features found in the curl-based AsyncHTTPClient are not yet
     supported.  In particular, proxies are not supported, connections
-    are not reused, and callers cannot select the network interface to be
-    used.
+    are only reused when ``max_keepalive_connections`` is set, and
+    callers cannot select the network interface to be used.
     """
     def initialize(self, io_loop, max_clients=10,
                    hostname_mapping=None, max_buffer_size=104857600,
                    resolver=None, defaults=None, max_header_size=None,
-                   max_body_size=None):
+                   max_body_size=None, max_keepalive_connections=0,
+                   keepalive_timeout=30.0):
         """Creates a AsyncHTTPClient.
 
         Only a single AsyncHTTPClient instance exists per IOLoop
@@ -88,8 +90,24 @@ class SimpleAsyncHTTPClient(AsyncHTTPClient):
         applies; with a ``streaming_callback`` only ``max_body_size``
         does.
 
+        ``max_keepalive_connections`` (default 0) is the number of idle
+        connections that are kept open after a response so that later
+        requests to the same host and port can reuse them instead of
+        opening a new connection (and repeating the TLS handshake).
+        Idle connections are closed after ``keepalive_timeout`` seconds;
+        this should be shorter than the servers' own idle timeout.
+        Connections are only reused for requests that use the default
+        ``ssl_options``.  A request that fails because the server closed
+        a reused connection before responding is retried once on a new
+        connection when its method is idempotent and it has no
+        ``body_producer``.
+
         .. versionchanged:: 4.2
            Added the ``max_body_size`` argument.
+
+        .. versionchanged:: 4.4
+           Added the ``max_keepalive_connections`` and
+           ``keepalive_timeout`` arguments.
         """
         super(SimpleAsyncHTTPClient, self).initialize(io_loop,
                                                       defaults=defaults)
@@ -100,6 +118,12 @@ class SimpleAsyncHTTPClient(AsyncHTTPClient):
         self.max_buffer_size = max_buffer_size
         self.max_header_size = max_header_size
         self.max_body_size = max_body_size
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_timeout = keepalive_timeout
+        # Idle keep-alive connections, as lists of (stream, timeout_handle)
+        # pairs keyed by (scheme, host, port, address family).
+        self._idle_streams = {}
+        self._num_idle_streams = 0
         # TCPClient could create a Resolver for us, but we have to do it
         # ourselves to support hostname_mapping.
         if resolver:
@@ -115,10 +139,54 @@ class SimpleAsyncHTTPClient(AsyncHTTPClient):
 
     def close(self):
         super(SimpleAsyncHTTPClient, self).close()
+        for idle in list(self._idle_streams.values()):
+            for stream, timeout_handle in idle:
+                self.io_loop.remove_timeout(timeout_handle)
+                stream.set_close_callback(None)
+                stream.close()
+        self._idle_streams.clear()
+        self._num_idle_streams = 0
         if self.own_resolver:
             self.resolver.close()
         self.tcp_client.close()
 
+    def _get_idle_stream(self, key):
+        """Returns an open idle connection for ``key``, or None."""
+        idle = self._idle_streams.get(key)
+        while idle:
+            stream, timeout_handle = idle.pop()
+            self._num_idle_streams -= 1
+            self.io_loop.remove_timeout(timeout_handle)
+            stream.set_close_callback(None)
+            if not stream.closed():
+                return stream
+        return None
+
+    def _put_idle_stream(self, key, stream):
+        """Keeps ``stream`` open for reuse by a later request to ``key``."""
+        if (self._closed or
+                self._num_idle_streams >= self.max_keepalive_connections):
+            stream.close()
+            return
+        entry = [stream, None]
+
+        def remove():
+            idle = self._idle_streams.get(key)
+            if idle is not None and entry in idle:
+                idle.remove(entry)
+                self._num_idle_streams -= 1
+                self.io_loop.remove_timeout(entry[1])
+            stream.close()
+        # The stream is no longer associated with the request that used it.
+        with stack_context.NullContext():
+            entry[1] = self.io_loop.add_timeout(
+                self.io_loop.time() + self.keepalive_timeout, remove)
+            # Watching for close also drops connections the server shuts
+            # down while they are idle.
+            stream.set_close_callback(remove)
+        self._idle_streams.setdefault(key, []).append(entry)
+        self._num_idle_streams += 1
+
     def fetch_impl(self, request, callback):
         key = object()
         self.queue.append((key, request, callback))
@@ -172,7 +240,9 @@ class SimpleAsyncHTTPClient(AsyncHTTPClient):
         self.queue.remove((key, request, callback))
         timeout_response = HTTPResponse(
             request, 599, error=HTTPError(599, "Timeout"),
-            request_time=self.io_loop.time() - request.start_time)
+            # request.start_time comes from time.time(), which need not
+            # be the clock the IOLoop uses.
+            request_time=time.time() - request.start_time)
         self.io_loop.add_callback(callback, timeout_response)
         del self.waiting[key]
 
@@ -200,6 +270,12 @@ class _HTTPConnection(httputil.HTTPMessageDelegate):
         # Timeout handle returned by IOLoop.add_timeout
         self._timeout = None
         self._sockaddr = None
+        # Key under which the connection may be kept alive for reuse,
+        # or None if it will be closed after this request.
+        self._pool_key = None
+        # True while the request runs on a connection from the pool.
+        self._reused_stream = False
+        self._request_written = False
         with stack_context.ExceptionStackContext(self._handle_exception):
             self.parsed = urlparse.urlsplit(_unicode(self.request.url))
             if self.parsed.scheme not in ("http", "https"):
@@ -224,16 +300,32 @@ class _HTTPConnection(httputil.HTTPMessageDelegate):
                 af = socket.AF_UNSPEC
 
             ssl_options = self._get_ssl_options(self.parsed.scheme)
+            # (client is None for websocket connections.)
+            if (client is not None and client.max_keepalive_connections and
+                    ssl_options in (None, _client_ssl_defaults)):
+                self._pool_key = (self.parsed.scheme, host, port, af)
+            self._connect_args = (host, port, af, ssl_options)
 
             timeout = min(self.request.connect_timeout, self.request.request_timeout)
             if timeout:
                 self._timeout = self.io_loop.add_timeout(
                     self.start_time + timeout,
                     stack_context.wrap(self._on_timeout))
-            self.tcp_client.connect(host, port, af=af,
-                                    ssl_options=ssl_options,
-                                    max_buffer_size=self.max_buffer_size,
-                                    callback=self._on_connect)
+            stream = None
+            if self._pool_key is not None:
+                stream = client._get_idle_stream(self._pool_key)
+            if stream is not None:
+                self._reused_stream = True
+                self.io_loop.add_callback(self._on_connect, stream)
+            else:
+                self._connect()
+
+    def _connect(self):
+        host, port, af, ssl_options = self._connect_args
+        self.tcp_client.connect(host, port, af=af,
+                                ssl_options=ssl_options,
+                                max_buffer_size=self.max_buffer_size,
+                                callback=self._on_connect)
 
     def _get_ssl_options(self, scheme):
         if scheme == "https":
@@ -317,7 +409,12 @@ class _HTTPConnection(httputil.HTTPMessageDelegate):
             if getattr(self.request, key, None):
                 raise NotImplementedError('%s not supported' % key)
         if "Connection" not in self.request.headers:
-            self.request.headers["Connection"] = "close"
+            if self._pool_key is None:
+                self.request.headers["Connection"] = "close"
+            else:
+                # HTTP/1.1 connections are persistent by default, but
+                # some HTTP/1.0 servers only keep them open when asked.
+                self.request.headers["Connection"] = "keep-alive"
         if "Host" not in self.request.headers:
             if '@' in self.parsed.netloc:
                 self.request.headers["Host"] = self.parsed.netloc.rpartition('@')[-1]
@@ -397,11 +494,13 @@ class _HTTPConnection(httputil.HTTPMessageDelegate):
                 def on_body_written(fut):
                     fut.result()
                     self.connection.finish()
+                    self._request_written = True
                     if start_read:
                         self._read_response()
                 self.io_loop.add_future(fut, on_body_written)
                 return
         self.connection.finish()
+        self._request_written = True
         if start_read:
             self._read_response()
 
@@ -426,6 +525,18 @@ class _HTTPConnection(httputil.HTTPMessageDelegate):
             self.io_loop.add_callback(final_callback, response)
 
     def _handle_exception(self, typ, value, tb):
+        if (self.final_callback and self._reused_stream and
+                self.code is None and isinstance(value, StreamClosedError) and
+                self.request.method in ("GET", "HEAD", "OPTIONS", "PUT",
+                                        "DELETE") and
+                self.request.body_producer is None):
+            # The server closed the idle connection just as we reused
+            # it.  Nothing was received, so try once more on a fresh one.
+            self._reused_stream = False
+            self._request_written = False
+            self.stream.close()
+            self._connect()
+            return True
         if self.final_callback:
             self._remove_timeout()
             if isinstance(value, StreamClosedError):
@@ -467,6 +578,7 @@ class _HTTPConnection(httputil.HTTPMessageDelegate):
         self.code = first_line.code
         self.reason = first_line.reason
         self.headers = headers
+        self._response_version = first_line.version
 
         if self._should_follow_redirect():
             return
@@ -532,7 +644,31 @@ class _HTTPConnection(httputil.HTTPMessageDelegate):
         self._on_end_request()
 
     def _on_end_request(self):
-        self.stream.close()
+        if self._can_reuse_stream():
+            self.client._put_idle_stream(self._pool_key,
+                                         self.connection.detach())
+        else:
+            self.stream.close()
+
+    def _can_reuse_stream(self):
+        # After a 100-continue response HTTP1Connection keeps using the
+        # stream once the final response is done, so it can't be handed
+        # over.
+        if (self._pool_key is None or not self._request_written or
+                self.request.expect_100_continue or self.stream.closed()):
+            return False
+        if (self.request.headers.get("Connection", "").lower() == "close" or
+                self.headers.get("Connection", "").lower() == "close"):
+            return False
+        if (self._response_version != "HTTP/1.1" and
+                self.headers.get("Connection", "").lower() != "keep-alive"):
+            return False
+        # The response must have had a well-defined end; a body that
+        # runs until the connection closes can't be followed by another.
+        return (self.request.method == "HEAD" or
+                self.code in (204, 304) or
+                "Content-Length" in self.headers or
+                self.headers.get("Transfer-Encoding", "").lower() == "chunked")
 
     def data_received(self, chunk):
         if self._should_follow_redirect():
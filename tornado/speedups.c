@@ -26,8 +26,71 @@ static PyObject* websocket_mask(PyObject* self, PyObject* args) {
     return result;
 }
 
+#if PY_VERSION_HEX >= 0x03030000
+static PyObject* xhtml_escape(PyObject* self, PyObject* value) {
+    Py_ssize_t i, j, len;
+    Py_ssize_t extra = 0;
+    int kind;
+    void* data;
+    void* out;
+    PyObject* result;
+
+    if (!PyUnicode_Check(value)) {
+        PyErr_Format(PyExc_TypeError, "Expected str; got %R", Py_TYPE(value));
+        return NULL;
+    }
+    if (PyUnicode_READY(value) < 0) {
+        return NULL;
+    }
+    len = PyUnicode_GET_LENGTH(value);
+    kind = PyUnicode_KIND(value);
+    data = PyUnicode_DATA(value);
+
+    /* First pass: compute the size of the escaped string. */
+    for (i = 0; i < len; i++) {
+        switch (PyUnicode_READ(kind, data, i)) {
+        case '&': extra += 4; break;  /* &amp; */
+        case '<': extra += 3; break;  /* &lt; */
+        case '>': extra += 3; break;  /* &gt; */
+        case '"': extra += 5; break;  /* &quot; */
+        case '\'': extra += 4; break;  /* &#39; */
+        }
+    }
+    if (extra == 0) {
+        Py_INCREF(value);
+        return value;
+    }
+
+    result = PyUnicode_New(len + extra, PyUnicode_MAX_CHAR_VALUE(value));
+    if (!result) {
+        return NULL;
+    }
+    out = PyUnicode_DATA(result);
+#define WRITE_LITERAL(s) do { \
+        const char* p = (s); \
+        while (*p) { PyUnicode_WRITE(kind, out, j++, *p++); } \
+    } while (0)
+    for (i = 0, j = 0; i < len; i++) {
+        Py_UCS4 c = PyUnicode_READ(kind, data, i);
+        switch (c) {
+        case '&': WRITE_LITERAL("&amp;"); break;
+        case '<': WRITE_LITERAL("&lt;"); break;
+        case '>': WRITE_LITERAL("&gt;"); break;
+        case '"': WRITE_LITERAL("&quot;"); break;
+        case '\'': WRITE_LITERAL("&#39;"); break;
+        default: PyUnicode_WRITE(kind, out, j++, c);
+        }
+    }
+#undef WRITE_LITERAL
+    return result;
+}
+#endif
+
 static PyMethodDef methods[] = {
     {"websocket_mask",  websocket_mask, METH_VARARGS, ""},
+#if PY_VERSION_HEX >= 0x03030000
+    {"xhtml_escape",  xhtml_escape, METH_O, ""},
+#endif
     {NULL, NULL, 0, NULL}
 };
 
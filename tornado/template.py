@@ -225,6 +225,32 @@ def filter_whitespace(mode, text):
         raise Exception("invalid whitespace mode %s" % mode)
 
 
+def _xhtml_escape_utf8(value):
+    """Convert an expression's value to utf8 and HTML-escape it.
+
+    This is what the code generated for ``{{ ... }}`` does under the
+    default ``xhtml_escape`` autoescape mode, folded into one call so the
+    value isn't encoded to utf8, decoded again by `.xhtml_escape` and
+    re-encoded.
+    """
+    if not isinstance(value, (unicode_type, bytes)):
+        value = str(value)
+    return escape.utf8(escape.xhtml_escape(value))
+
+
+def _make_escape_utf8(escape_func):
+    """Like `_xhtml_escape_utf8` for an overridden ``xhtml_escape``.
+
+    The replacement function sees utf8 bytes, just as it would with the
+    unspecialized generated code.
+    """
+    def escape_utf8(value):
+        if not isinstance(value, (unicode_type, bytes)):
+            value = str(value)
+        return escape.utf8(escape_func(escape.utf8(value)))
+    return escape_utf8
+
+
 class Template(object):
     """编译模板.
 
@@ -311,6 +337,7 @@ class Template(object):
             "linkify": escape.linkify,
             "datetime": datetime,
             "_tt_utf8": escape.utf8,  # for internal use
+            "_tt_xhtml_escape": _xhtml_escape_utf8,  # for internal use
             "_tt_string_types": (unicode_type, bytes),
             # __name__ and __loader__ allow the traceback mechanism to find
             # the generated source code.
@@ -319,6 +346,9 @@ class Template(object):
         }
         namespace.update(self.namespace)
         namespace.update(kwargs)
+        if namespace["xhtml_escape"] is not escape.xhtml_escape:
+            namespace["_tt_xhtml_escape"] = _make_escape_utf8(
+                namespace["xhtml_escape"])
         exec_in(self.compiled, namespace)
         execute = namespace["_tt_execute"]
         # Clear the traceback module's cache of source data now that
@@ -600,6 +630,12 @@ class _Expression(_Node):
 
     def generate(self, writer):
         writer.write_line("_tt_tmp = %s" % self.expression, self.line)
+        if (not self.raw and
+                writer.current_template.autoescape == "xhtml_escape"):
+            # Specialize the default autoescape mode into a single call.
+            writer.write_line("_tt_append(_tt_xhtml_escape(_tt_tmp))",
+                              self.line)
+            return
         writer.write_line("if isinstance(_tt_tmp, _tt_string_types):"
                           " _tt_tmp = _tt_utf8(_tt_tmp)", self.line)
         writer.write_line("else: _tt_tmp = _tt_utf8(str(_tt_tmp))", self.line)
@@ -4,10 +4,15 @@
 from __future__ import absolute_import, division, print_function, with_statement
 import tornado.escape
 
-from tornado.escape import utf8, xhtml_escape, xhtml_unescape, url_escape, url_unescape, to_unicode, json_decode, json_encode, squeeze, recursive_unicode
+from tornado.escape import utf8, xhtml_escape, xhtml_unescape, url_escape, url_unescape, to_unicode, json_decode, json_encode, squeeze, recursive_unicode, parse_qs_bytes
 from tornado.util import u, unicode_type
 from tornado.test.util import unittest
 
+try:
+    from tornado.speedups import xhtml_escape as speedups_xhtml_escape
+except ImportError:
+    speedups_xhtml_escape = None
+
 linkify_tests = [
     # (input, linkify_kwargs, expected_output)
 
@@ -138,6 +143,18 @@ class EscapeTestCase(unittest.TestCase):
             linked = tornado.escape.linkify(text, **kwargs)
             self.assertEqual(linked, html)
 
+    @unittest.skipIf(bytes is str,
+                     "python 2 regexes use ascii-only classes by default")
+    def test_linkify_unicode_classes(self):
+        # \b, \w and \s are unicode-aware: there is no word boundary
+        # between a CJK character and the scheme, and an ideographic
+        # space ends the url.
+        self.assertEqual(tornado.escape.linkify(u("\u89c1http://a.com")),
+                         u("\u89c1http://a.com"))
+        self.assertEqual(
+            tornado.escape.linkify(u("http://a.com\u3000\u8c22\u8c22")),
+            u('<a href="http://a.com">http://a.com</a>\u3000\u8c22\u8c22'))
+
     def test_xhtml_escape(self):
         tests = [
             ("<foo>", "&lt;foo&gt;"),
@@ -154,6 +171,21 @@ class EscapeTestCase(unittest.TestCase):
             self.assertEqual(utf8(xhtml_escape(unescaped)), utf8(escaped))
             self.assertEqual(utf8(unescaped), utf8(xhtml_unescape(escaped)))
 
+    def test_xhtml_escape_cache(self):
+        cache = tornado.escape._XHTML_ESCAPE_CACHE
+        for i in range(tornado.escape._XHTML_ESCAPE_CACHE_SIZE + 10):
+            self.assertEqual(xhtml_escape(u("<%d>") % i), u("&lt;%d&gt;") % i)
+            self.assertLessEqual(len(cache),
+                                 tornado.escape._XHTML_ESCAPE_CACHE_SIZE)
+        # Repeated calls return the cached value.
+        self.assertEqual(xhtml_escape(u("<1>")), u("&lt;1&gt;"))
+        self.assertEqual(xhtml_escape(u("<1>")), u("&lt;1&gt;"))
+        # Long strings bypass the cache.
+        long_value = u("<") * (tornado.escape._XHTML_ESCAPE_CACHE_MAX_LEN + 1)
+        self.assertEqual(xhtml_escape(long_value),
+                         u("&lt;") * len(long_value))
+        self.assertNotIn(long_value, cache)
+
     def test_xhtml_unescape_numeric(self):
         tests = [
             ('foo&#32;bar', 'foo bar'),
@@ -167,6 +199,18 @@ class EscapeTestCase(unittest.TestCase):
         for escaped, unescaped in tests:
             self.assertEqual(unescaped, xhtml_unescape(escaped))
 
+    def test_xhtml_unescape_unrecognized(self):
+        # Only complete, semicolon-terminated HTML 4 entities are decoded,
+        # the same way on every python version.
+        tests = [
+            ('&copy2015', '&copy2015'),
+            ('&amp', '&amp'),
+            ('&#0;', u('\u0000')),
+            ('&NotEqualTilde;', '&NotEqualTilde;'),
+        ]
+        for escaped, unescaped in tests:
+            self.assertEqual(unescaped, xhtml_unescape(escaped))
+
     def test_url_escape_unicode(self):
         tests = [
             # byte strings are passed through as-is
@@ -205,6 +249,26 @@ class EscapeTestCase(unittest.TestCase):
         self.assertEqual(url_unescape(escaped, encoding=None, plus=False),
                          utf8(unescaped))
 
+    def test_parse_qs_bytes(self):
+        self.assertEqual(parse_qs_bytes("a=1&b=%C3%A9&b=+x&c=&d"),
+                         {"a": [b"1"], "b": [b"\xc3\xa9", b" x"]})
+        self.assertEqual(parse_qs_bytes("c=&d", keep_blank_values=True),
+                         {"c": [b""], "d": [b""]})
+        if bytes is not str:
+            # Keys are decoded as latin1 on python 3.
+            self.assertEqual(parse_qs_bytes("%E9=1"), {u("\u00e9"): [b"1"]})
+        self.assertEqual(parse_qs_bytes(""), {})
+        self.assertEqual(parse_qs_bytes(b""), {})
+
+    def test_parse_qs_bytes_strict(self):
+        self.assertEqual(parse_qs_bytes("a=1&b=", strict_parsing=True),
+                         {"a": [b"1"]})
+        # Like urlparse.parse_qs, an empty string or a field without "="
+        # is an error in strict mode.
+        for qs in ("", b"", "a=1&&b=2", "a=1&b"):
+            with self.assertRaises(ValueError):
+                parse_qs_bytes(qs, strict_parsing=True)
+
     def test_escape_return_types(self):
         # On python2 the escape methods should generally return the same
         # type as their argument
@@ -225,6 +289,9 @@ class EscapeTestCase(unittest.TestCase):
         # convert automatically if they are utf8; on python 3 byte strings
         # are not allowed.
         self.assertEqual(json_decode(json_encode(u("\u00e9"))), u("\u00e9"))
+        # Output is safe to embed in a <script> tag.
+        self.assertEqual(json_encode({"a": [1, u("</script>")]}),
+                         '{"a": [1, "<\\/script>"]}')
         if bytes is str:
             self.assertEqual(json_decode(json_encode(utf8(u("\u00e9")))), u("\u00e9"))
             self.assertRaises(UnicodeDecodeError, json_encode, b"\xe9")
@@ -243,3 +310,28 @@ class EscapeTestCase(unittest.TestCase):
         self.assertEqual(recursive_unicode(tests['list']), [u("foo"), u("bar")])
         self.assertEqual(recursive_unicode(tests['tuple']), (u("foo"), u("bar")))
         self.assertEqual(recursive_unicode(tests['bytes']), u("foo"))
+
+
+class XhtmlEscapeFunctionMixin(object):
+    def test_escape(self):
+        tests = [
+            (u(""), u("")),
+            (u("foo"), u("foo")),
+            (u("<>&\"'"), u("&lt;&gt;&amp;&quot;&#39;")),
+            (u("<\u00e9>"), u("&lt;\u00e9&gt;")),
+            (u("\u4e2d<\u6587>"), u("\u4e2d&lt;\u6587&gt;")),
+        ]
+        for unescaped, escaped in tests:
+            self.assertEqual(self.escape(unescaped), escaped)
+
+
+class PythonXhtmlEscapeFunctionTest(XhtmlEscapeFunctionMixin, unittest.TestCase):
+    def escape(self, value):
+        return tornado.escape._xhtml_escape_python(value)
+
+
+@unittest.skipIf(speedups_xhtml_escape is None,
+                 "tornado.speedups.xhtml_escape not present")
+class CXhtmlEscapeFunctionTest(XhtmlEscapeFunctionMixin, unittest.TestCase):
+    def escape(self, value):
+        return speedups_xhtml_escape(value)
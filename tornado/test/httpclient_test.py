@@ -7,10 +7,12 @@ import binascii
 from contextlib import closing
 import copy
 import functools
+import gc
 import sys
 import threading
 import datetime
 from io import BytesIO
+import weakref
 
 from tornado.escape import utf8
 from tornado import gen
@@ -358,6 +360,19 @@ Transfer-Encoding: chunked
         finally:
             client.close()
 
+    def test_mutate_defaults(self):
+        # Each client has its own defaults dict, which may be changed
+        # after construction without affecting other clients.
+        client = self.http_client.__class__(self.io_loop, force_instance=True)
+        try:
+            client.defaults['user_agent'] = 'TestMutatedUserAgent'
+            self.assertNotIn('user_agent', self.http_client.defaults)
+            client.fetch(self.get_url('/user_agent'), callback=self.stop)
+            response = self.wait()
+            self.assertEqual(response.body, b'TestMutatedUserAgent')
+        finally:
+            client.close()
+
     def test_header_types(self):
         # Header values may be passed as character or utf8 byte strings,
         # in a plain dictionary or an HTTPHeaders object.
@@ -373,6 +388,15 @@ Transfer-Encoding: chunked
                     "response=%r, value=%r, container=%r" %
                     (resp.body, value, container))
 
+    def test_headers_not_modified(self):
+        # The client adds headers like Host to its copy of the request
+        # headers; the caller's object is left alone.
+        for container in [dict, HTTPHeaders]:
+            headers = container()
+            headers['User-Agent'] = 'MyUserAgent'
+            self.fetch('/user_agent', headers=headers)
+            self.assertEqual(list(headers.keys()), ['User-Agent'])
+
     def test_multi_line_headers(self):
         # Multi-line http headers are rare but rfc-allowed
         # http://www.w3.org/Protocols/rfc2616/rfc2616-sec4.html#sec4.2
@@ -446,6 +470,29 @@ X-XSS-Protection: 1;
         response = yield self.http_client.fetch(self.get_url('/notfound'), raise_error=False)
         self.assertEqual(response.code, 404)
 
+    @gen_test
+    def test_fetch_many(self):
+        responses = yield self.http_client.fetch_many(
+            [self.get_url('/hello'),
+             HTTPRequest(self.get_url('/echopost'), method='POST',
+                         body='foo')])
+        self.assertEqual([r.body for r in responses],
+                         [b'Hello world!', b'foo'])
+
+    @gen_test
+    def test_fetch_many_http_error(self):
+        with self.assertRaises(HTTPError) as context:
+            yield self.http_client.fetch_many(
+                [self.get_url('/hello'), self.get_url('/notfound')])
+        self.assertEqual(context.exception.code, 404)
+
+    @gen_test
+    def test_fetch_many_http_error_no_raise(self):
+        responses = yield self.http_client.fetch_many(
+            [self.get_url('/hello'), self.get_url('/notfound')],
+            raise_error=False)
+        self.assertEqual([r.code for r in responses], [200, 404])
+
     @gen_test
     def test_reuse_request_from_response(self):
         # The response.request attribute should be an HTTPRequest, not
@@ -555,6 +602,13 @@ class RequestProxyTest(unittest.TestCase):
         proxy = _RequestProxy(HTTPRequest('http://example.com/'), None)
         self.assertIs(proxy.auth_username, None)
 
+    def test_repeated_access(self):
+        proxy = _RequestProxy(HTTPRequest('http://example.com/'),
+                              dict(network_interface='foo'))
+        self.assertEqual(proxy.network_interface, 'foo')
+        self.assertEqual(proxy.network_interface, 'foo')
+        self.assertIs(proxy.request.network_interface, None)
+
 
 class HTTPResponseTestCase(unittest.TestCase):
     def test_str(self):
@@ -564,6 +618,53 @@ class HTTPResponseTestCase(unittest.TestCase):
         self.assertTrue(s.startswith('HTTPResponse('))
         self.assertIn('code=200', s)
 
+    def test_repr(self):
+        response = HTTPResponse(HTTPRequest('http://example.com'), 404,
+                                buffer=BytesIO(b'secret'))
+        text = repr(response)
+        self.assertTrue(text.startswith("HTTPResponse(_body=None,buffer="),
+                        text)
+        for field in ("code=404,", "effective_url='http://example.com',",
+                      "error=HTTPError", "headers=", "reason='Not Found',",
+                      "request=<tornado.httpclient.HTTPRequest",
+                      "request_time=None,", "time_info={}"):
+            self.assertIn(field, text)
+
+    def test_body_view(self):
+        response = HTTPResponse(HTTPRequest('http://example.com'), 200,
+                                buffer=BytesIO(b'hello'))
+        self.assertEqual(response.body_view[1:].tobytes(), b'ello')
+        self.assertEqual(response.body, b'hello')
+        self.assertEqual(response.body_view.tobytes(), b'hello')
+        response = HTTPResponse(HTTPRequest('http://example.com'), 200)
+        self.assertIsNone(response.body_view)
+
+    def test_body_view_read_only(self):
+        response = HTTPResponse(HTTPRequest('http://example.com'), 200,
+                                buffer=BytesIO(b'hello'))
+        view = response.body_view
+        self.assertTrue(view.readonly)
+        with self.assertRaises(TypeError):
+            view[0:1] = b'j'
+        if sys.version_info >= (3, 8):
+            # The view shares the buffer's memory, which therefore
+            # can't be resized until the view is released.
+            with self.assertRaises(BufferError):
+                response.buffer.write(b'!')
+            view.release()
+            response.buffer.seek(0, 2)
+            response.buffer.write(b'!')
+            self.assertEqual(response.body, b'hello!')
+        else:
+            self.assertEqual(response.body, b'hello')
+
+    def test_default_headers_and_time_info(self):
+        response = HTTPResponse(HTTPRequest('http://example.com'), 599)
+        self.assertIsInstance(response.headers, HTTPHeaders)
+        self.assertEqual(len(response.headers), 0)
+        self.assertIs(response.headers, response.headers)
+        self.assertEqual(response.time_info, {})
+
 
 class SyncHTTPClientTest(unittest.TestCase):
     def setUp(self):
@@ -617,6 +718,25 @@ class SyncHTTPClientTest(unittest.TestCase):
             self.http_client.fetch(self.get_url('/notfound'))
         self.assertEqual(assertion.exception.code, 404)
 
+    @unittest.skipIf(sys.version_info < (3, 4),
+                     "objects with __del__ in cycles need PEP 442")
+    def test_cycle_collected(self):
+        closed = []
+
+        class ClosingHTTPClient(HTTPClient):
+            def close(self):
+                closed.append(True)
+                super(ClosingHTTPClient, self).close()
+
+        client = ClosingHTTPClient()
+        client.cycle = client
+        ref = weakref.ref(client)
+        del client
+        gc.collect()
+        self.assertIsNone(ref())
+        # Collection goes through the (overridable) close() method.
+        self.assertEqual(closed, [True])
+
 
 class HTTPRequestTestCase(unittest.TestCase):
     def test_headers(self):
@@ -659,3 +779,7 @@ class HTTPErrorTestCase(unittest.TestCase):
     def test_str(self):
         e = HTTPError(403)
         self.assertEqual(str(e), "HTTP 403: Forbidden")
+        # Attributes may be changed after the error is first formatted.
+        e.code = 404
+        e.message = "Gone fishing"
+        self.assertEqual(str(e), "HTTP 404: Gone fishing")
@@ -954,6 +954,30 @@ class IdleTimeoutTest(AsyncHTTPTestCase):
         self.assertEqual(data, "closed")
 
 
+class CloseAllConnectionsTest(AsyncHTTPTestCase):
+    def get_app(self):
+        return Application([('/', HelloWorldRequestHandler)])
+
+    def test_close_all_connections(self):
+        streams = []
+        for i in range(3):
+            stream = IOStream(socket.socket())
+            stream.connect(('127.0.0.1', self.get_http_port()), self.stop)
+            self.wait()
+            # Finish a request so the server has accepted the connection.
+            stream.write(b"GET / HTTP/1.1\r\n\r\n")
+            stream.read_until(b"Hello world", self.stop)
+            self.wait()
+            streams.append(stream)
+        self.assertEqual(len(self.http_server._connections), 3)
+        self.io_loop.run_sync(self.http_server.close_all_connections)
+        self.assertEqual(len(self.http_server._connections), 0)
+        for stream in streams:
+            stream.read_until_close(self.stop)
+            self.wait()
+            stream.close()
+
+
 class BodyLimitsTest(AsyncHTTPTestCase):
     def get_app(self):
         class BufferedHandler(RequestHandler):
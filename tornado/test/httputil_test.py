@@ -319,6 +319,15 @@ Foo: even
         self.assertEqual(headers['quux'], 'xyzzy')
         self.assertEqual(sorted(headers.get_all()), [('Foo', 'bar'), ('Quux', 'xyzzy')])
 
+    def test_from_dict(self):
+        source = {'content-type': 'text/html', 'X-Foo': 'bar'}
+        headers = HTTPHeaders(source)
+        self.assertEqual(sorted(headers.get_all()),
+                         [('Content-Type', 'text/html'), ('X-Foo', 'bar')])
+        self.assertEqual(headers.get_list('x-foo'), ['bar'])
+        headers['X-Foo'] = 'baz'
+        self.assertEqual(source['X-Foo'], 'bar')
+
 
 class FormatTimestampTest(unittest.TestCase):
     # Make sure that all the input types are supported.
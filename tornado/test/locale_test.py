@@ -7,6 +7,8 @@ import tempfile
 
 import tornado.locale
 from tornado.escape import utf8, to_unicode
+from tornado.log import gen_log
+from tornado.testing import ExpectLog
 from tornado.test.util import unittest, skipOnAppEngine
 from tornado.util import u, unicode_type
 
@@ -59,6 +61,22 @@ class TranslationLoaderTest(unittest.TestCase):
             finally:
                 shutil.rmtree(tmpdir)
 
+    # tempfile.mkdtemp is not available on app engine.
+    @skipOnAppEngine
+    def test_csv_bad_file_name(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            shutil.copy(os.path.join(os.path.dirname(__file__),
+                                     'csv_translations', 'fr_FR.csv'),
+                        tmpdir)
+            with open(os.path.join(tmpdir, 'es.LA.csv'), 'wb'):
+                pass
+            with ExpectLog(gen_log, "Unrecognized locale 'es.LA'"):
+                tornado.locale.load_translations(tmpdir)
+            self.assertEqual(sorted(tornado.locale._translations), ['fr_FR'])
+        finally:
+            shutil.rmtree(tmpdir)
+
     def test_gettext(self):
         tornado.locale.load_gettext_translations(
             os.path.join(os.path.dirname(__file__), 'gettext_translations'),
@@ -115,6 +133,9 @@ class EnglishTest(unittest.TestCase):
     def test_friendly_number(self):
         locale = tornado.locale.get('en_US')
         self.assertEqual(locale.friendly_number(1000000), '1,000,000')
+        self.assertEqual(locale.friendly_number(999), '999')
+        self.assertEqual(locale.friendly_number(-1234), '-1,234')
+        self.assertEqual(locale.friendly_number('1234'), '1,234')
 
     def test_list(self):
         locale = tornado.locale.get('en_US')
@@ -156,6 +156,21 @@ class ConditionTest(AsyncTestCase):
         c.notify(2)
         self.assertTrue(all(f.done() for f in futures))
 
+    def test_notify_all_reentrant_wait(self):
+        # A waiter that waits again from its callback is not woken by the
+        # same notify_all().
+        c = locks.Condition()
+        futures = [c.wait() for _ in range(2)]
+        rewaits = []
+        futures[0].add_done_callback(lambda _: rewaits.append(c.wait()))
+        c.notify_all()
+        self.assertTrue(all(f.done() for f in futures))
+        self.assertEqual(1, len(rewaits))
+        self.assertFalse(rewaits[0].done())
+        self.assertEqual(1, len(c._waiters))
+        c.notify_all()
+        self.assertTrue(rewaits[0].done())
+
     @gen_test
     def test_garbage_collection(self):
         # Test that timed-out waiters are occasionally cleaned from the queue.
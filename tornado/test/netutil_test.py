@@ -7,7 +7,8 @@ from subprocess import Popen
 import sys
 import time
 
-from tornado.netutil import BlockingResolver, ThreadedResolver, is_valid_ip, bind_sockets
+from tornado.concurrent import Future
+from tornado.netutil import BlockingResolver, ThreadedResolver, CachingResolver, Resolver, is_valid_ip, bind_sockets
 from tornado.stack_context import ExceptionStackContext
 from tornado.testing import AsyncTestCase, gen_test, bind_unused_port
 from tornado.test.util import unittest, skipIfNoNetwork
@@ -119,6 +120,104 @@ class ThreadedResolverErrorTest(AsyncTestCase, _ResolverErrorTestMixin):
         super(ThreadedResolverErrorTest, self).tearDown()
 
 
+@skipIfNoNetwork
+@unittest.skipIf(futures is None, "futures module not present")
+class CachingResolverTest(AsyncTestCase, _ResolverTestMixin):
+    def setUp(self):
+        super(CachingResolverTest, self).setUp()
+        self.resolver = CachingResolver(ThreadedResolver(io_loop=self.io_loop))
+
+    def tearDown(self):
+        self.resolver.close()
+        super(CachingResolverTest, self).tearDown()
+
+
+class CachingResolverErrorTest(AsyncTestCase, _ResolverErrorTestMixin):
+    def setUp(self):
+        super(CachingResolverErrorTest, self).setUp()
+        self.resolver = CachingResolver(BlockingResolver(io_loop=self.io_loop))
+        self.real_getaddrinfo = socket.getaddrinfo
+        socket.getaddrinfo = _failing_getaddrinfo
+
+    def tearDown(self):
+        socket.getaddrinfo = self.real_getaddrinfo
+        super(CachingResolverErrorTest, self).tearDown()
+
+
+class _CountingResolver(Resolver):
+    def initialize(self, mapping):
+        self.mapping = mapping
+        self.calls = 0
+
+    def resolve(self, host, port, family=socket.AF_UNSPEC):
+        self.calls += 1
+        future = Future()
+        if host in self.mapping:
+            future.set_result([(socket.AF_INET, (self.mapping[host], port))])
+        else:
+            future.set_exception(IOError("mock: lookup failed"))
+        return future
+
+
+class CachingResolverCacheTest(AsyncTestCase):
+    def setUp(self):
+        super(CachingResolverCacheTest, self).setUp()
+        self.counter = _CountingResolver({'a': '10.0.0.1', 'b': '10.0.0.2'})
+
+    @gen_test
+    def test_cached(self):
+        resolver = CachingResolver(self.counter)
+        first = yield resolver.resolve('a', 80)
+        second = yield resolver.resolve('a', 80)
+        self.assertEqual(first, [(socket.AF_INET, ('10.0.0.1', 80))])
+        self.assertEqual(second, first)
+        self.assertEqual(self.counter.calls, 1)
+        yield resolver.resolve('a', 443)
+        self.assertEqual(self.counter.calls, 2)
+
+    @gen_test
+    def test_expired(self):
+        resolver = CachingResolver(self.counter, ttl=0)
+        yield resolver.resolve('a', 80)
+        yield resolver.resolve('a', 80)
+        self.assertEqual(self.counter.calls, 2)
+
+    @gen_test
+    def test_error_not_cached(self):
+        resolver = CachingResolver(self.counter)
+        for i in range(2):
+            with self.assertRaises(IOError):
+                yield resolver.resolve('c', 80)
+        self.assertEqual(self.counter.calls, 2)
+
+    @gen_test
+    def test_concurrent_lookups_shared(self):
+        resolver = CachingResolver(self.counter)
+        results = yield [resolver.resolve('a', 80) for i in range(3)]
+        self.assertEqual(results, [[(socket.AF_INET, ('10.0.0.1', 80))]] * 3)
+        self.assertEqual(self.counter.calls, 1)
+        futures = [resolver.resolve('c', 80) for i in range(2)]
+        for future in futures:
+            with self.assertRaises(IOError):
+                yield future
+        self.assertEqual(self.counter.calls, 2)
+
+    def test_callback(self):
+        resolver = CachingResolver(self.counter)
+        resolver.resolve('a', 80, callback=self.stop)
+        self.assertEqual(self.wait(), [(socket.AF_INET, ('10.0.0.1', 80))])
+
+    @gen_test
+    def test_max_entries(self):
+        resolver = CachingResolver(self.counter, max_entries=1)
+        yield resolver.resolve('a', 80)
+        yield resolver.resolve('b', 80)
+        yield resolver.resolve('b', 80)
+        self.assertEqual(self.counter.calls, 2)
+        yield resolver.resolve('a', 80)
+        self.assertEqual(self.counter.calls, 3)
+
+
 @skipIfNoNetwork
 @unittest.skipIf(futures is None, "futures module not present")
 @unittest.skipIf(sys.platform == 'win32', "preexec_fn not available on win32")
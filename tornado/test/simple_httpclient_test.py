@@ -10,6 +10,7 @@ import re
 import socket
 import ssl
 import sys
+import time
 
 from tornado.escape import to_unicode
 from tornado import gen
@@ -356,7 +357,9 @@ class SimpleHTTPClientTestMixin(object):
             response = self.wait()
 
             self.assertEqual(response.code, 599)
-            self.assertTrue(response.request_time < 1, response.request_time)
+            # request_time covers the time spent waiting in the queue.
+            self.assertTrue(0.09 < response.request_time < 1,
+                            response.request_time)
             self.assertEqual(str(response.error), "HTTP 599: Timeout")
             self.triggers.popleft()()
             self.wait()
@@ -474,6 +477,45 @@ class SimpleHTTPClientTestCase(SimpleHTTPClientTestMixin, AsyncHTTPTestCase):
                                      **kwargs)
 
 
+class QueueTimeoutClockTestCase(AsyncHTTPTestCase):
+    # An IOLoop whose clock is far from time.time(), like one configured
+    # with a monotonic time_func.
+    def get_new_ioloop(self):
+        return IOLoop(time_func=lambda: time.time() - 1000000)
+
+    def get_app(self):
+        return Application([url("/hang", HangHandler),
+                            url("/hello", HelloWorldHandler)])
+
+    def test_queue_timeout_request_time(self):
+        with closing(SimpleAsyncHTTPClient(self.io_loop, force_instance=True,
+                                           max_clients=1)) as client:
+            client.fetch(self.get_url('/hang'), lambda response: None,
+                         request_timeout=10)
+            # With raise_error=False the response built by the queue
+            # timeout reaches the callback unchanged.
+            client.fetch(self.get_url('/hello'), self.stop,
+                         connect_timeout=0.1, raise_error=False)
+            response = self.wait()
+            self.assertEqual(response.code, 599)
+            # request_time is measured on the same clock as the request's
+            # start_time, not the IOLoop's.
+            self.assertTrue(0.09 < response.request_time < 1,
+                            response.request_time)
+
+
+class SimpleHTTPClientKeepAliveTestCase(SimpleHTTPClientTestMixin,
+                                        AsyncHTTPTestCase):
+    def setUp(self):
+        super(SimpleHTTPClientKeepAliveTestCase, self).setUp()
+        self.http_client = self.create_client()
+
+    def create_client(self, **kwargs):
+        kwargs.setdefault('max_keepalive_connections', 10)
+        return SimpleAsyncHTTPClient(self.io_loop, force_instance=True,
+                                     **kwargs)
+
+
 class SimpleHTTPSClientTestCase(SimpleHTTPClientTestMixin, AsyncHTTPSTestCase):
     def setUp(self):
         super(SimpleHTTPSClientTestCase, self).setUp()
@@ -718,6 +760,84 @@ class MaxBodySizeTest(AsyncHTTPTestCase):
         self.assertEqual(response.code, 599)
 
 
+class KeepAliveTest(AsyncHTTPTestCase):
+    def get_app(self):
+        requests_per_port = collections.Counter()
+
+        class PortHandler(RequestHandler):
+            def get(self):
+                self.write(str(self.request.connection.stream.socket.
+                               getpeername()[1]))
+
+        class CloseHandler(RequestHandler):
+            def get(self):
+                self.set_header('Connection', 'close')
+                self.write('closing')
+
+        class CloseSecondHandler(RequestHandler):
+            # Drops the second request made on each connection without
+            # responding, like a server closing an idle connection.
+            @asynchronous
+            def get(self):
+                port = self.request.connection.stream.socket.getpeername()[1]
+                requests_per_port[port] += 1
+                if requests_per_port[port] == 2:
+                    self.request.connection.detach().close()
+                else:
+                    self.finish(str(port))
+
+            post = get
+
+        return Application([('/port', PortHandler),
+                            ('/close', CloseHandler),
+                            ('/close_second', CloseSecondHandler)])
+
+    def get_http_client(self):
+        return SimpleAsyncHTTPClient(io_loop=self.io_loop, force_instance=True,
+                                     max_keepalive_connections=2)
+
+    def test_reuse(self):
+        first = self.fetch('/port')
+        second = self.fetch('/port')
+        self.assertEqual(first.body, second.body)
+        self.assertEqual(self.http_client._num_idle_streams, 1)
+
+    def test_disabled_by_default(self):
+        with closing(SimpleAsyncHTTPClient(self.io_loop,
+                                           force_instance=True)) as client:
+            client.fetch(self.get_url('/port'), self.stop)
+            first = self.wait()
+            client.fetch(self.get_url('/port'), self.stop)
+            second = self.wait()
+            self.assertNotEqual(first.body, second.body)
+            self.assertEqual(client._num_idle_streams, 0)
+
+    def test_keepalive_timeout(self):
+        self.http_client.keepalive_timeout = 0.01
+        first = self.fetch('/port')
+        self.io_loop.add_timeout(self.io_loop.time() + 0.05, self.stop)
+        self.wait()
+        self.assertEqual(self.http_client._num_idle_streams, 0)
+        second = self.fetch('/port')
+        self.assertNotEqual(first.body, second.body)
+
+    def test_connection_close(self):
+        response = self.fetch('/close')
+        self.assertEqual(response.body, b'closing')
+        self.assertEqual(self.http_client._num_idle_streams, 0)
+
+    def test_retry_closed_connection(self):
+        first = self.fetch('/close_second')
+        second = self.fetch('/close_second')
+        second.rethrow()
+        self.assertNotEqual(first.body, second.body)
+
+    def test_no_retry_post(self):
+        self.fetch('/close_second', method='POST', body=b'')
+        response = self.fetch('/close_second', method='POST', body=b'')
+        self.assertEqual(response.code, 599)
+
+
 class MaxBufferSizeTest(AsyncHTTPTestCase):
     def get_app(self):
 
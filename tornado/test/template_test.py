@@ -404,6 +404,20 @@ raw: {% raw name %}""",
         self.assertEqual(render("foo.py", ["not a string"]),
                          b"""s = "['not a string']"\n""")
 
+    def test_overridden_xhtml_escape(self):
+        loader = DictLoader({"foo.html": "{{ name }}"},
+                            autoescape="xhtml_escape")
+
+        def xhtml_escape(s):
+            self.assertEqual(type(s), bytes)
+            return s.upper()
+
+        self.assertEqual(loader.load("foo.html").generate(name="<a>"),
+                         b"&lt;a&gt;")
+        self.assertEqual(loader.load("foo.html").generate(
+            name="<a>", xhtml_escape=xhtml_escape), b"<A>")
+        self.assertEqual(loader.load("foo.html").generate(name=42), b"42")
+
     def test_manual_minimize_whitespace(self):
         # Whitespace including newlines is allowed within template tags
         # and directives, and this is one way to avoid long lines while